@@ -17,47 +17,113 @@ Server → Swift  text  frame  : JSON response
 Audio chunking
 --------------
 Swift sends audio in ~3-second binary frames (48 000 float32 samples at 16 kHz).
-The server accumulates frames and transcribes each one independently, prepending
-a small overlap from the previous chunk to avoid cutting words at boundaries.
+The server transcribes each frame independently, prepending a small overlap
+from the previous chunk to avoid cutting words at boundaries. If Whisper falls
+behind, frames that have queued up are merged into a single transcription.
 """
 
 import asyncio
+import concurrent.futures
+import ctypes
+import ctypes.util
 import json
+import multiprocessing
 import os
+import select
 import signal
 import sys
 import threading
 import time
+from typing import Awaitable, Callable
+
+# Pin BLAS/OpenMP pool sizes before numpy (or a Whisper backend) loads them;
+# the defaults of one thread per core oversubscribe the CPU once inference,
+# the event loop and the OS all compete for it.
+_THREADS = str(max(1, (os.cpu_count() or 2) // 2))
+for _var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS",
+             "OPENBLAS_NUM_THREADS", "VECLIB_MAXIMUM_THREADS"):
+    os.environ.setdefault(_var, _THREADS)
+
 import numpy as np
 import websockets
+import websockets.exceptions  # not loaded by "import websockets" alone on 14+
+
+try:
+    import uvloop  # libuv-based event loop; noticeably less per-message overhead
+except ImportError:
+    uvloop = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Suppress tqdm progress bars from mlx-whisper/huggingface_hub leaking into console
 os.environ.setdefault("TQDM_DISABLE", "1")
 os.environ.setdefault("HF_HUB_DISABLE_PROGRESS_BARS", "1")
 
-from transcriber import Transcriber, SAMPLE_RATE
+from transcriber import (
+    Transcriber, SAMPLE_RATE, is_apple_silicon,
+    init_worker, worker_ping, worker_transcribe,
+)
 
 
 # ---------------------------------------------------------------------------
 # Parent-death watchdog
 # ---------------------------------------------------------------------------
 # If the Swift app crashes or is force-killed, applicationWillTerminate never
-# runs. This daemon thread polls the parent PID every 2 s and self-terminates
-# when the parent is gone, so the server never becomes an orphan.
+# runs. The server asks the kernel to tell it when the parent exits and then
+# self-terminates, so it never becomes an orphan:
+#   macOS — a daemon thread blocks on a kqueue EVFILT_PROC / NOTE_EXIT event
+#   Linux — prctl(PR_SET_PDEATHSIG) has the kernel deliver SIGTERM directly
+# Anywhere else it falls back to polling the parent PID every 2 s.
 
-def _parent_watchdog() -> None:
-    ppid = os.getppid()
+_PR_SET_PDEATHSIG = 1
+
+
+def _parent_gone() -> None:
+    print("[server] Parent process gone — shutting down.", flush=True)
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+def _kqueue_watchdog(ppid: int) -> None:
+    kq = select.kqueue()
+    try:
+        kq.control([select.kevent(
+            ppid,
+            filter=select.KQ_FILTER_PROC,
+            flags=select.KQ_EV_ADD,
+            fflags=select.KQ_NOTE_EXIT,
+        )], 0)
+    except ProcessLookupError:
+        _parent_gone()  # parent exited before we registered
+        return
+    kq.control(None, 1)  # blocks until the parent exits
+    _parent_gone()
+
+
+def _polling_watchdog(ppid: int) -> None:
     while True:
         time.sleep(2)
         try:
             os.kill(ppid, 0)  # signal 0 = existence check only
         except (ProcessLookupError, PermissionError):
-            print("[server] Parent process gone — shutting down.", flush=True)
-            os.kill(os.getpid(), signal.SIGTERM)
+            _parent_gone()
             return
 
 
-threading.Thread(target=_parent_watchdog, daemon=True).start()
+def _install_parent_watchdog() -> None:
+    ppid = os.getppid()
+
+    if sys.platform.startswith("linux"):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if libc.prctl(_PR_SET_PDEATHSIG, signal.SIGTERM) == 0:
+            if os.getppid() != ppid:
+                _parent_gone()  # parent exited before prctl took effect
+            return
+
+    target = _kqueue_watchdog if hasattr(select, "kqueue") else _polling_watchdog
+    threading.Thread(target=target, args=(ppid,), daemon=True).start()
 
 
 # Clean SIGTERM handler so the server exits with code 0 (not an unhandled signal)
@@ -66,55 +132,168 @@ def _handle_sigterm(signum, frame):
     sys.exit(0)
 
 
-signal.signal(signal.SIGTERM, _handle_sigterm)
-
 HOST = "127.0.0.1"
 PORT = int(os.environ.get("LIVESCRIBE_PORT", "8765"))
 MODEL_SIZE = os.environ.get("LIVESCRIBE_MODEL", "small")
+BEAM_SIZE = int(os.environ.get("LIVESCRIBE_BEAM", "1"))
+
+# faster-whisper worker processes; by default enough that workers × threads
+# per worker fills the cores.
+WORKERS = int(os.environ.get(
+    "LIVESCRIBE_WORKERS",
+    str(max(1, (os.cpu_count() or 2) // int(os.environ["OMP_NUM_THREADS"]))),
+))
 
 # Small overlap prepended to each chunk to avoid cutting words at boundaries.
 # 0.15 s is enough to catch split words without causing noticeable repetition.
 OVERLAP_SAMPLES = int(SAMPLE_RATE * 0.15)
 
+# Initial capacity of the per-session scratch buffer (6 s — twice the nominal
+# frame size). The buffer grows on demand if a larger frame ever arrives.
+MAX_CHUNK_SAMPLES = SAMPLE_RATE * 6
+
+# When transcription falls behind, queued audio frames are merged into one
+# Whisper call of at most this many samples (15 s).
+MAX_BATCH_SAMPLES = SAMPLE_RATE * 15
+
+# Messages buffered per connection before the reader stops pulling from the
+# socket (backpressure to the client).
+INBOX_SIZE = 16
+
+# Replies buffered per connection for the writer task; when a client stops
+# draining its socket, further replies are dropped rather than stalling
+# transcription.
+OUTBOX_SIZE = 64
+
+# Largest accepted message (4 MiB, ~65 s of audio) and the per-connection
+# write buffer high-water mark.
+MAX_MESSAGE_BYTES = 2 ** 22
+WRITE_LIMIT = 2 ** 19
+
 
 # ---------------------------------------------------------------------------
 # Session state
 # ---------------------------------------------------------------------------
 
+# Shared empty overlap; nothing ever writes to it.
+_EMPTY_F32 = np.empty(0, dtype=np.float32)
+_EMPTY_F32.flags.writeable = False
+
+
 class Session:
     """Holds per-connection state."""
 
+    __slots__ = ("active", "overlap", "_scratch", "_overlap_buf")
+
     def __init__(self):
         self.active = False
-        self.overlap: np.ndarray = np.array([], dtype=np.float32)
-
+        self.overlap: np.ndarray = _EMPTY_F32
+        # Preallocated buffers reused for every frame, so the hot path does
+        # not allocate: overlap + chunk is assembled in _scratch, and the
+        # tail kept for the next frame lives in _overlap_buf.
+        self._scratch = np.empty(OVERLAP_SAMPLES + MAX_CHUNK_SAMPLES, dtype=np.float32)
+        self._overlap_buf = np.empty(OVERLAP_SAMPLES, dtype=np.float32)
+
+    # The scratch buffers are kept across start/stop cycles.
     def reset(self):
         self.active = True
-        self.overlap = np.array([], dtype=np.float32)
+        self.overlap = _EMPTY_F32
 
     def stop(self):
         self.active = False
-        self.overlap = np.array([], dtype=np.float32)
+        self.overlap = _EMPTY_F32
+
+    def window(self, chunks: list[np.ndarray]) -> np.ndarray:
+        """
+        Return overlap + chunks as a view into the scratch buffer and keep the
+        tail of the new audio as the overlap for the next call.
+
+        The returned array is only valid until the next call.
+        """
+        n_overlap = len(self.overlap)
+        n = sum(len(c) for c in chunks)
+        end = n_overlap + n
+        if end > len(self._scratch):
+            self._scratch = np.empty(end, dtype=np.float32)
+
+        np.copyto(self._scratch[:n_overlap], self.overlap)
+        pos = n_overlap
+        for chunk in chunks:
+            self._scratch[pos:pos + len(chunk)] = chunk
+            pos += len(chunk)
+        audio = self._scratch[:end]
+
+        # Update overlap for next chunk. The tail is copied into a buffer we
+        # own, so no view keeps a whole received frame alive between calls.
+        tail = min(n, OVERLAP_SAMPLES)
+        np.copyto(self._overlap_buf[:tail], audio[end - tail:])
+        self.overlap = self._overlap_buf[:tail]
+
+        return audio
 
 
 # ---------------------------------------------------------------------------
 # Handler
 # ---------------------------------------------------------------------------
 
-async def handler(websocket, transcriber: Transcriber):
+# Marks "nothing held back" in handler; distinct from the None end-of-stream
+# sentinel, which may itself be the message held back from a batch.
+_NO_PENDING = object()
+
+
+async def _reader_loop(ws, inbox: asyncio.Queue):
+    """Move incoming messages into inbox; None marks the end of the stream."""
+    try:
+        async for message in ws:
+            await inbox.put(message)
+    except websockets.exceptions.ConnectionClosedOK:
+        pass
+    except websockets.exceptions.ConnectionClosedError as e:
+        print(f"[server] Connection closed with error: {e}", flush=True)
+    await inbox.put(None)
+
+
+async def _writer_loop(ws, outbox: asyncio.Queue):
+    """Send queued replies so the handler never waits on socket drain."""
+    try:
+        while True:
+            await ws.send(await outbox.get())
+    except websockets.exceptions.ConnectionClosed:
+        pass
+
+
+async def handler(websocket, infer: Callable[[np.ndarray], Awaitable[str]]):
     session = Session()
     remote = websocket.remote_address
 
     print(f"[server] Client connected: {remote}", flush=True)
 
+    # Messages are read by a separate task so that, when Whisper falls behind,
+    # every audio frame already waiting can be coalesced into a single call.
+    inbox: asyncio.Queue = asyncio.Queue(maxsize=INBOX_SIZE)
+    reader = asyncio.create_task(_reader_loop(websocket, inbox))
+    outbox: asyncio.Queue = asyncio.Queue(maxsize=OUTBOX_SIZE)
+    writer = asyncio.create_task(_writer_loop(websocket, outbox))
+
+    # The model is already loaded by the time we accept connections
+    outbox.put_nowait(READY_MSG)
+    pending = _NO_PENDING  # message taken from inbox but not yet handled
+
     try:
-        async for message in websocket:
+        while True:
+            if pending is not _NO_PENDING:
+                message, pending = pending, _NO_PENDING
+            else:
+                message = await inbox.get()
+            if message is None:
+                break
+
             # ── Text control message ──────────────────────────────────────
             if isinstance(message, str):
                 try:
                     cmd = json.loads(message)
                 except json.JSONDecodeError:
-                    await _send(websocket, {"type": "error", "message": "Invalid JSON"})
+                    _send(outbox, {"type": "error", "message": "Invalid JSON"})
                     continue
 
                 if cmd.get("type") == "start":
@@ -130,47 +309,62 @@ async def handler(websocket, transcriber: Transcriber):
                 if not session.active:
                     continue  # ignore audio outside a session
 
-                # Decode float32 little-endian samples
+                # Coalesce audio frames that are already queued, up to
+                # MAX_BATCH_SAMPLES, stopping at the first control message.
+                frames = [message]
                 n_samples = len(message) // 4
+                while not inbox.empty():
+                    extra = inbox.get_nowait()
+                    if (not isinstance(extra, bytes)
+                            or n_samples + len(extra) // 4 > MAX_BATCH_SAMPLES):
+                        pending = extra
+                        break
+                    frames.append(extra)
+                    n_samples += len(extra) // 4
+
                 if n_samples == 0:
                     continue
 
-                chunk = np.frombuffer(message, dtype="<f4").astype(np.float32)
+                # Decode float32 little-endian samples as zero-copy, read-only
+                # views; Session.window copies them into the scratch buffer.
+                # "<f4" is native float32 on every host we run on.
+                chunks = [np.frombuffer(f, dtype="<f4") for f in frames]
 
                 # Prepend overlap from previous chunk
-                audio = (
-                    np.concatenate([session.overlap, chunk])
-                    if len(session.overlap) > 0
-                    else chunk
-                )
-
-                # Update overlap for next chunk
-                session.overlap = chunk[-OVERLAP_SAMPLES:] if len(chunk) >= OVERLAP_SAMPLES else chunk
+                audio = session.window(chunks)
 
-                # Transcribe (may be slow — run in executor to avoid blocking)
-                loop = asyncio.get_event_loop()
-                text = await loop.run_in_executor(None, transcriber.transcribe, audio)
+                # Transcribe (may be slow — runs in an executor, never on the loop)
+                text = await infer(audio)
 
                 if text:
-                    await _send(websocket, {
+                    _send(outbox, {
                         "type": "transcript",
                         "text": text,
                         "is_final": False,
                     })
 
-    except websockets.exceptions.ConnectionClosedOK:
-        pass
-    except websockets.exceptions.ConnectionClosedError as e:
-        print(f"[server] Connection closed with error: {e}", flush=True)
     finally:
+        reader.cancel()
+        writer.cancel()
         print(f"[server] Client disconnected: {remote}", flush=True)
 
 
-async def _send(ws, payload: dict):
+def _dumps(payload: dict) -> str:
+    # Replies stay text frames; orjson is still several times faster than json.
+    if orjson is not None:
+        return orjson.dumps(payload).decode()
+    return json.dumps(payload)
+
+
+# Serialised once; sent to every client as it connects.
+READY_MSG = _dumps({"type": "ready"})
+
+
+def _send(outbox: asyncio.Queue, payload: dict):
     try:
-        await ws.send(json.dumps(payload))
-    except websockets.exceptions.ConnectionClosed:
-        pass
+        outbox.put_nowait(_dumps(payload))
+    except asyncio.QueueFull:
+        pass  # client is not reading; drop rather than block
 
 
 # ---------------------------------------------------------------------------
@@ -179,15 +373,67 @@ async def _send(ws, payload: dict):
 
 async def main():
     print(f"[server] Loading Whisper model '{MODEL_SIZE}' …", flush=True)
-    transcriber = Transcriber(model_size=MODEL_SIZE)
+    loop = asyncio.get_running_loop()
+
+    if is_apple_silicon():
+        transcriber = Transcriber(model_size=MODEL_SIZE, beam_size=BEAM_SIZE)
+
+        # MLX already spreads one forward pass across the GPU, so inference
+        # from all clients is serialised on one worker thread instead of
+        # running encoders in parallel.
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="whisper",
+        )
+        await loop.run_in_executor(executor, transcriber.warm_up)
+
+        async def infer(audio: np.ndarray) -> str:
+            return await loop.run_in_executor(executor, transcriber.transcribe, audio)
+    else:
+        # CPU inference: a pool of warm worker processes, each with its own
+        # model, so connections run in parallel without contending for the
+        # GIL in mel extraction and segment post-processing.
+        # The forkserver preloads __main__ by default; preload only what the
+        # workers need instead of re-executing this server module.
+        mp_context = multiprocessing.get_context("forkserver")
+        mp_context.set_forkserver_preload(["transcriber"])
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=WORKERS,
+            mp_context=mp_context,
+            initializer=init_worker,
+            initargs=(MODEL_SIZE, BEAM_SIZE),
+        )
+        # Start every worker now; each loads and warms its model in the
+        # initializer and only then takes tasks. A worker that is already up
+        # can answer several pings, so keep pinging until every worker (by
+        # pid) has answered.
+        ready_pids: set[int] = set()
+        while True:
+            ready_pids.update(await asyncio.gather(*(
+                loop.run_in_executor(executor, worker_ping) for _ in range(WORKERS)
+            )))
+            if len(ready_pids) >= WORKERS:
+                break
+            await asyncio.sleep(0.5)
+
+        async def infer(audio: np.ndarray) -> str:
+            # tobytes() also copies out of the session's scratch buffer
+            return await loop.run_in_executor(executor, worker_transcribe, audio.tobytes())
 
     async def _handler(ws):
-        await handler(ws, transcriber)
+        await handler(ws, infer)
 
     # Retry binding — the previous server instance may still be releasing the port
     for attempt in range(1, 7):
         try:
-            async with websockets.serve(_handler, HOST, PORT):
+            async with websockets.serve(
+                _handler, HOST, PORT,
+                # float32 audio doesn't compress; deflate would be pure overhead
+                compression=None,
+                max_size=MAX_MESSAGE_BYTES,
+                write_limit=WRITE_LIMIT,
+                ping_interval=20,
+                ping_timeout=20,
+            ):
                 print(f"[server] Listening on ws://{HOST}:{PORT}", flush=True)
                 print("READY", flush=True)
                 await asyncio.Future()  # run forever
@@ -201,7 +447,14 @@ async def main():
 
 
 if __name__ == "__main__":
+    # Process-level setup happens here rather than at import time, because
+    # pool workers import this module as __mp_main__ and must not install
+    # the watchdog thread or the SIGTERM handler themselves.
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+    _install_parent_watchdog()
+
+    run = uvloop.run if uvloop is not None else asyncio.run
     try:
-        asyncio.run(main())
+        run(main())
     except KeyboardInterrupt:
         print("\n[server] Shutting down.", flush=True)
@@ -4,7 +4,7 @@ test_client.py — End-to-end test for the LiveScribe WebSocket server.
 
 Protocol:
   1. Connect to ws://127.0.0.1:8765
-  2. Wait for {"type": "ready"} (server signals model is loaded)
+  2. Expect {"type": "ready"} as the first message (FAIL if it is missing)
   3. Send {"type": "start"}
   4. Send one binary frame: 3-second 440 Hz sine wave at 16 kHz mono float32
      (48 000 samples)
@@ -26,7 +26,31 @@ import websockets
 
 
 URI = "ws://127.0.0.1:8765"
-TIMEOUT = 30.0   # seconds to wait for a transcript reply
+TIMEOUT = 30.0        # seconds to wait for a transcript reply
+READY_TIMEOUT = 5.0   # seconds to wait for the "ready" frame after connecting
+
+
+async def _wait_transcript(ws) -> dict:
+    """
+    Read messages until a transcript arrives and return it.
+    Raises RuntimeError if the server reports an error first.
+    """
+    while True:
+        raw = await ws.recv()
+        try:
+            msg = json.loads(raw)
+        except json.JSONDecodeError:
+            print(f"[client] Non-JSON message received: {raw!r}")
+            continue
+
+        print(f"[client] Received: {msg}")
+
+        msg_type = msg.get("type")
+        if msg_type == "transcript":
+            return msg
+        elif msg_type == "error":
+            raise RuntimeError(msg.get("message"))
+        # Ignore any other message types and keep waiting
 
 
 async def run_test() -> bool:
@@ -37,21 +61,18 @@ async def run_test() -> bool:
         print("[client] Connected.")
 
         # ------------------------------------------------------------------
-        # Wait for the server's "ready" signal (it may arrive immediately,
-        # or we might have connected before/after — handle both cases).
-        # We give it 5 s; if no "ready" arrives we proceed anyway (the server
-        # already printed READY to stdout before we connected).
+        # The server sends {"type": "ready"} as the first message on every
+        # connection; anything else (or nothing) is a protocol failure.
         # ------------------------------------------------------------------
         print("[client] Waiting for ready signal …")
         try:
-            raw = await asyncio.wait_for(ws.recv(), timeout=5.0)
-            msg = json.loads(raw)
-            if msg.get("type") == "ready":
-                print("[client] Server is ready.")
-            else:
-                print(f"[client] First message was not 'ready': {msg}")
+            raw = await asyncio.wait_for(ws.recv(), timeout=READY_TIMEOUT)
         except asyncio.TimeoutError:
-            print("[client] No 'ready' message received within 5 s — proceeding anyway.")
+            raise RuntimeError(f"no 'ready' message within {READY_TIMEOUT} s")
+        msg = json.loads(raw)
+        if msg.get("type") != "ready":
+            raise RuntimeError(f"first message was not 'ready': {msg}")
+        print("[client] Server is ready.")
 
         # ------------------------------------------------------------------
         # Send start command
@@ -79,34 +100,13 @@ async def run_test() -> bool:
         transcript_text = None
 
         try:
-            deadline = asyncio.get_event_loop().time() + TIMEOUT
-            while asyncio.get_event_loop().time() < deadline:
-                remaining = deadline - asyncio.get_event_loop().time()
-                if remaining <= 0:
-                    break
-                try:
-                    raw = await asyncio.wait_for(ws.recv(), timeout=remaining)
-                except asyncio.TimeoutError:
-                    break
-
-                try:
-                    msg = json.loads(raw)
-                except json.JSONDecodeError:
-                    print(f"[client] Non-JSON message received: {raw!r}")
-                    continue
-
-                msg_type = msg.get("type")
-                print(f"[client] Received: {msg}")
-
-                if msg_type == "transcript":
-                    transcript_received = True
-                    transcript_text = msg.get("text", "")
-                    break
-                elif msg_type == "error":
-                    print(f"[client] ERROR from server: {msg.get('message')}")
-                    break
-                # Ignore any other message types and keep waiting
-
+            msg = await asyncio.wait_for(_wait_transcript(ws), timeout=TIMEOUT)
+            transcript_received = True
+            transcript_text = msg.get("text", "")
+        except asyncio.TimeoutError:
+            pass
+        except RuntimeError as e:
+            print(f"[client] ERROR from server: {e}")
         except websockets.exceptions.ConnectionClosed as e:
             print(f"[client] Connection closed unexpectedly: {e}")
 
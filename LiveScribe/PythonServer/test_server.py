@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+test_server.py — Connection-lifecycle checks for the LiveScribe server handler.
+
+Drives server.handler with an in-memory fake websocket and a stub inference
+coroutine, so no model is loaded and no port is opened. Each scenario must
+finish within TIMEOUT seconds; a hang means the handler never noticed that
+the client went away.
+
+Scenarios:
+  1. Client closes without sending audio
+  2. Client sends one audio frame, then closes (frame still queued at close)
+  3. Frames queued behind a slow transcription are coalesced into one call,
+     and the batch stops at a control message
+
+Run directly (prints PASS / FAIL) or via pytest.
+"""
+
+import asyncio
+import json
+import sys
+
+import numpy as np
+
+import server
+
+
+TIMEOUT = 2.0   # seconds each scenario may take before it counts as a hang
+
+
+class _FakeWebSocket:
+    """
+    Yields the given messages, then behaves like a cleanly closed socket.
+    An asyncio.Event in the list is not delivered; the socket waits for it.
+    """
+
+    def __init__(self, messages):
+        self._messages = list(messages)
+        self.remote_address = ("127.0.0.1", 0)
+        self.sent = []
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while self._messages:
+            message = self._messages.pop(0)
+            if isinstance(message, asyncio.Event):
+                await message.wait()
+                continue
+            return message
+        raise StopAsyncIteration
+
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+
+
+class _SlowInfer:
+    """Records the length of every chunk and takes a moment per call."""
+
+    def __init__(self):
+        self.lengths = []
+        self.started = asyncio.Event()
+
+    async def __call__(self, audio: np.ndarray) -> str:
+        self.lengths.append(len(audio))
+        self.started.set()
+        await asyncio.sleep(0.05)  # lets the client queue more frames
+        return "hello"
+
+
+async def _run(messages, infer=None) -> _FakeWebSocket:
+    ws = _FakeWebSocket(messages)
+    await asyncio.wait_for(server.handler(ws, infer or _SlowInfer()), timeout=TIMEOUT)
+    assert ws.sent[0] == {"type": "ready"}, ws.sent
+    return ws
+
+
+FRAME_SAMPLES = 48_000   # one 3 s frame
+START = json.dumps({"type": "start"})
+STOP = json.dumps({"type": "stop"})
+
+
+def _frame() -> bytes:
+    return np.zeros(FRAME_SAMPLES, dtype=np.float32).tobytes()
+
+
+def test_close_without_audio():
+    asyncio.run(_run([START]))
+
+
+def test_frame_then_close():
+    asyncio.run(_run([START, _frame()]))
+
+
+def test_coalesces_queued_frames():
+    async def scenario():
+        infer = _SlowInfer()
+        await _run([
+            START, _frame(),
+            infer.started,               # the rest arrives while it transcribes
+            _frame(), _frame(), _frame(), _frame(),
+            STOP, _frame(),              # ignored: outside a session
+            START, _frame(),
+        ], infer)
+        return infer.lengths
+
+    lengths = asyncio.run(scenario())
+    assert lengths == [
+        FRAME_SAMPLES,
+        server.OVERLAP_SAMPLES + 4 * FRAME_SAMPLES,  # one call, ends at STOP
+        FRAME_SAMPLES,                               # new session, no overlap
+    ], lengths
+
+
+def main():
+    failed = False
+    for test in (test_close_without_audio, test_frame_then_close,
+                 test_coalesces_queued_frames):
+        try:
+            test()
+            print(f"[test] {test.__name__}: ok")
+        except asyncio.TimeoutError:
+            print(f"[test] {test.__name__}: handler did not return within {TIMEOUT} s")
+            failed = True
+        except AssertionError as e:
+            print(f"[test] {test.__name__}: {e}")
+            failed = True
+
+    print("FAIL" if failed else "PASS")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,17 +10,31 @@ Usage:
     text = t.transcribe(audio_np)  # audio_np: float32 numpy array, 16 kHz mono
 """
 
+import os
 import platform
 import sys
 import numpy as np
 
 SAMPLE_RATE = 16_000  # Hz — Whisper's native sample rate
 
+# Chunks quieter than both thresholds are treated as silence and never reach
+# the Whisper backend.
+SILENCE_RMS = 0.005
+SILENCE_PEAK = 0.02
 
-def _is_apple_silicon() -> bool:
+# webrtcvad accepts 10/20/30 ms frames of 16-bit PCM.
+_VAD_FRAME_SAMPLES = SAMPLE_RATE * 30 // 1000
+
+
+def is_apple_silicon() -> bool:
     return platform.system() == "Darwin" and platform.machine() == "arm64"
 
 
+def _cpu_threads() -> int:
+    # server.py pins OMP_NUM_THREADS at startup; follow it when set.
+    return int(os.environ.get("OMP_NUM_THREADS", max(1, (os.cpu_count() or 2) // 2)))
+
+
 # ---------------------------------------------------------------------------
 # MLX backend (Apple Silicon)
 # ---------------------------------------------------------------------------
@@ -37,44 +51,108 @@ _MLX_MODEL_MAP = {
 class _MLXBackend:
     def __init__(self, model_size: str):
         try:
-            import mlx_whisper  # noqa: F401
+            import mlx.core as mx
+            from mlx_whisper.audio import (
+                N_FRAMES, N_SAMPLES, log_mel_spectrogram,
+            )
+            from mlx_whisper.decoding import DecodingOptions, decode
+            from mlx_whisper.load_models import load_model
         except ImportError:
             sys.exit("mlx-whisper not installed. Run: pip install mlx-whisper")
 
         self._model_path = _MLX_MODEL_MAP.get(model_size, _MLX_MODEL_MAP["small"])
-        self._mlx_whisper = __import__("mlx_whisper")
+
+        # Decode each chunk directly instead of going through
+        # mlx_whisper.transcribe, which re-resolves the model and runs its
+        # seek/segment loop for every call — mostly overhead on 3-second
+        # chunks. Each window is decoded once, greedily: rather than retrying
+        # at higher temperatures as transcribe() does, a result its fallback
+        # would have rejected is dropped, since the next chunk follows moments
+        # later anyway.
+        self._mx = mx
+        self._n_frames = N_FRAMES
+        self._n_samples = N_SAMPLES
+        self._log_mel_spectrogram = log_mel_spectrogram
+        self._decode = decode
+        self._model = load_model(self._model_path, dtype=mx.float16)
+        self._options = DecodingOptions(
+            language="en", without_timestamps=True, fp16=True,
+        )
         print(f"[transcriber] MLX backend loaded: {self._model_path}", flush=True)
 
     def transcribe(self, audio: np.ndarray) -> str:
-        result = self._mlx_whisper.transcribe(
-            audio,
-            path_or_hf_repo=self._model_path,
-            language="en",
-            verbose=None,   # None = silent; False paradoxically *enables* the tqdm bar
-            word_timestamps=False,
+        # Whisper sees at most 30 s at a time; decode longer audio window by
+        # window rather than letting pad_or_trim drop the rest.
+        texts = (
+            self._transcribe_window(audio[start:start + self._n_samples])
+            for start in range(0, len(audio), self._n_samples)
+        )
+        return " ".join(t for t in texts if t)
+
+    def _transcribe_window(self, audio: np.ndarray) -> str:
+        # Pad the samples, not the spectrogram: zero audio gives the clamped
+        # silence floor Whisper was trained on, while zero mel frames would
+        # read as a loud flat noise floor.
+        mel = self._log_mel_spectrogram(
+            audio, n_mels=self._model.dims.n_mels, padding=self._n_samples,
         )
-        return result.get("text", "").strip()
+        # Always the full 30 s window (N_FRAMES), never shorter: the encoder
+        # asserts its input matches the 1500-position embedding, and decode()
+        # only accepts encoder output of that full length.
+        mel = mel[:self._n_frames].astype(self._mx.float16)
+        result = self._decode(self._model, mel, self._options)
+
+        # Same hallucination guards mlx_whisper.transcribe applies per segment:
+        # no speech, or a repetition loop (text that compresses too well).
+        if result.no_speech_prob > 0.6 and result.avg_logprob < -1.0:
+            return ""
+        if result.compression_ratio > 2.4:
+            return ""
+        return result.text.strip()
 
 
 # ---------------------------------------------------------------------------
 # faster-whisper backend (Intel / CUDA)
 # ---------------------------------------------------------------------------
 
+# Distil-Whisper checkpoints where one exists: much cheaper decoder, near
+# identical English WER. tiny/base have no distilled variant.
+# distil-large-v3 needs faster-whisper >= 1.0.2.
+_FASTER_WHISPER_MODEL_MAP = {
+    "tiny":   "tiny.en",
+    "base":   "base.en",
+    "small":  "distil-small.en",
+    "medium": "distil-medium.en",
+    "large":  "distil-large-v3",
+}
+
+
 class _FasterWhisperBackend:
-    def __init__(self, model_size: str):
+    def __init__(self, model_size: str, beam_size: int):
         try:
             from faster_whisper import WhisperModel
         except ImportError:
             sys.exit("faster-whisper not installed. Run: pip install faster-whisper")
 
-        self._model = WhisperModel(model_size, device="cpu", compute_type="int8")
-        print(f"[transcriber] faster-whisper backend loaded: {model_size}", flush=True)
+        model_name = _FASTER_WHISPER_MODEL_MAP.get(model_size, model_size)
+        self._model = WhisperModel(
+            model_name, device="cpu", compute_type="int8", num_workers=1,
+            cpu_threads=_cpu_threads(),
+        )
+        self._beam_size = beam_size
+        print(f"[transcriber] faster-whisper backend loaded: {model_name}", flush=True)
 
     def transcribe(self, audio: np.ndarray) -> str:
+        # Greedy, context-free decoding by default: each chunk is short and
+        # independent, so beam search buys little for its cost.
         segments, _ = self._model.transcribe(
             audio,
             language="en",
-            beam_size=3,
+            beam_size=self._beam_size,
+            best_of=1,
+            temperature=0.0,
+            condition_on_previous_text=False,
+            without_timestamps=True,
             vad_filter=True,
             vad_parameters={"min_silence_duration_ms": 300},
         )
@@ -86,11 +164,36 @@ class _FasterWhisperBackend:
 # ---------------------------------------------------------------------------
 
 class Transcriber:
-    def __init__(self, model_size: str = "small"):
-        if _is_apple_silicon():
+    def __init__(self, model_size: str = "small", beam_size: int = 1):
+        # beam_size applies to faster-whisper only; MLX decoding is greedy.
+        if is_apple_silicon():
             self._backend = _MLXBackend(model_size)
         else:
-            self._backend = _FasterWhisperBackend(model_size)
+            self._backend = _FasterWhisperBackend(model_size, beam_size)
+
+        # Optional: webrtcvad gives a finer speech check than RMS alone.
+        try:
+            import webrtcvad
+            self._vad = webrtcvad.Vad(2)
+        except ImportError:
+            self._vad = None
+
+    def _has_speech(self, audio: np.ndarray) -> bool:
+        """Return True if at least one 30 ms window is voiced."""
+        pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+        for start in range(0, len(pcm) - _VAD_FRAME_SAMPLES + 1, _VAD_FRAME_SAMPLES):
+            frame = pcm[start:start + _VAD_FRAME_SAMPLES].tobytes()
+            if self._vad.is_speech(frame, SAMPLE_RATE):
+                return True
+        return False
+
+    def warm_up(self) -> None:
+        """
+        Run one forward pass on 1 s of silence so MLX kernel compilation and
+        CT2 weight page-in happen now rather than on the first real chunk.
+        Calls the backend directly — transcribe() would skip silence.
+        """
+        self._backend.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32))
 
     def transcribe(self, audio: np.ndarray) -> str:
         """
@@ -103,12 +206,54 @@ class Transcriber:
         Returns:
             Transcribed text string (may be empty if no speech detected).
         """
-        if audio.dtype != np.float32:
+        owned = audio.dtype != np.float32
+        if owned:
             audio = audio.astype(np.float32)
 
-        # Normalise to [-1, 1] if needed
-        peak = np.abs(audio).max()
+        # Peak and energy without temporaries: max/min are plain reductions
+        # and the dot product sums the squares in one pass.
+        peak = max(float(audio.max()), -float(audio.min()))
+        rms = float(np.sqrt(np.dot(audio, audio) / len(audio)))
+
+        # Skip the encoder entirely on silence
+        if rms < SILENCE_RMS and peak < SILENCE_PEAK:
+            return ""
+
+        # Normalise to [-1, 1] if needed — in place when we already hold a copy
         if peak > 1.0:
-            audio = audio / peak
+            scale = np.float32(1.0 / peak)
+            if owned:
+                audio *= scale
+            else:
+                audio = audio * scale
+
+        if self._vad is not None and not self._has_speech(audio):
+            return ""
 
         return self._backend.transcribe(audio)
+
+
+# ---------------------------------------------------------------------------
+# Process-pool worker entry points
+# ---------------------------------------------------------------------------
+# Used by server.py on the faster-whisper backend: each worker process builds
+# its own Transcriber once (pool initializer) and then serves raw float32
+# bytes, which are far cheaper to ship across the process boundary than a
+# pickled array.
+
+_worker_transcriber = None
+
+
+def init_worker(model_size: str, beam_size: int) -> None:
+    global _worker_transcriber
+    _worker_transcriber = Transcriber(model_size=model_size, beam_size=beam_size)
+    _worker_transcriber.warm_up()
+
+
+def worker_ping() -> int:
+    """No-op task; a worker only answers once its initializer has finished."""
+    return os.getpid()
+
+
+def worker_transcribe(audio_bytes: bytes) -> str:
+    return _worker_transcriber.transcribe(np.frombuffer(audio_bytes, dtype=np.float32))